@@ -1,15 +1,8 @@
 import os
+import sys
 import logging
 from dotenv import load_dotenv
 
-from src.agent import PydanticAgent
-from src.tools import (
-    create_weather_tool,
-    create_search_tool,
-    create_calculator_tool,
-    create_time_tool
-)
-
 # Load environment variables from .env file
 load_dotenv()
 
@@ -17,19 +10,31 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+HISTORY_FILE = ".agent_history"
+FLUSH_CHARS = 32
+SENTENCE_ENDINGS = (".", "!", "?", "\n")
+
 def main():
     # Check for OpenAI API key
     if not os.getenv("OPENAI_API_KEY"):
         logger.error("OPENAI_API_KEY environment variable not set. Please set it in a .env file or export it.")
         return
     
-    # Create the agent
-    system_prompt = """You are a helpful AI assistant that can use tools to answer questions.
-    When using tools, follow this format:
+    # Deferred so that error paths don't pay for importing the agent stack
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.history import FileHistory
     
-    Using tool: [tool_name]
-    Parameters: [parameters as JSON]
+    from src.agent import PydanticAgent
+    from src.executors import ConcurrentExecutor
+    from src.tools import (
+        create_weather_tool,
+        create_search_tool,
+        create_calculator_tool,
+        create_time_tool
+    )
     
+    # Create the agent
+    system_prompt = """You are a helpful AI assistant that can use tools to answer questions.
     After using a tool, incorporate the results into your response.
     Be helpful, accurate, and concise.
     """
@@ -37,7 +42,8 @@ def main():
     agent = PydanticAgent(
         name="ToolUsingAssistant",
         description="An assistant that can use various tools to answer questions",
-        system_prompt=system_prompt
+        system_prompt=system_prompt,
+        tool_executor=ConcurrentExecutor()
     )
     
     # Add tools to the agent
@@ -66,14 +72,34 @@ def main():
     print("Type 'exit' to quit.")
     print("-" * 50)
     
+    # Line editing and persistent history when attached to a terminal
+    if sys.stdin.isatty():
+        read_input = PromptSession(history=FileHistory(HISTORY_FILE)).prompt
+    else:
+        read_input = input
+    
     while True:
-        user_input = input("You: ")
+        try:
+            user_input = read_input("You: ")
+        except EOFError:
+            user_input = "exit"
         if user_input.lower() in ["exit", "quit", "bye"]:
             print("🤖 Goodbye!")
+            agent.tool_executor.close()
             break
         
-        response = agent.process_user_input(user_input)
-        print(f"\n🤖: {response}\n")
+        # Stream the response as it is generated, flushing at sentence ends
+        # or once enough text has been buffered rather than on every token
+        sys.stdout.write("\n🤖: ")
+        unflushed = 0
+        for chunk in agent.stream_user_input(user_input):
+            sys.stdout.write(chunk)
+            unflushed += len(chunk)
+            if unflushed >= FLUSH_CHARS or chunk.endswith(SENTENCE_ENDINGS):
+                sys.stdout.flush()
+                unflushed = 0
+        sys.stdout.write("\n\n")
+        sys.stdout.flush()
         
         # Debug option
         if user_input.lower() == "debug":
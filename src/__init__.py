@@ -1 +1,12 @@
+"""Pydantic-based AI agent with tool use and memory."""
 
+from typing import Any
+
+__all__ = ["PydanticAgent"]
+
+def __getattr__(name: str) -> Any:
+    """Lazily re-export PydanticAgent so importing the package stays cheap."""
+    if name == "PydanticAgent":
+        from .agent import PydanticAgent
+        return PydanticAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
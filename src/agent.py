@@ -1,24 +1,88 @@
+import functools
+import hashlib
 import os
+import re
 import uuid
-from typing import List, Dict, Any, Optional
+from typing import TYPE_CHECKING, List, Dict, Any, Generator, Iterator, Optional, Tuple
 import logging
 from datetime import datetime
 
-from langchain.prompts import ChatPromptTemplate
-from langchain.llms import OpenAI
-from langchain.schema import SystemMessage, HumanMessage, AIMessage
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough
+# LangChain is slow to import, so it is only loaded once an agent needs it
+if TYPE_CHECKING:
+    from langchain_core.messages import AIMessage, ToolMessage
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.runnables import Runnable
 
-from .models import Agent, Message, Memory, Tool, AgentAction, AgentThought
+from .compression import compress_caveman
+from .executors import ToolExecutor, SequentialExecutor
+from .models import Agent, Message, Memory, Tool, ToolCall, AgentAction, AgentThought
+from .persistence import dump_agent, load_agent
+from .tools import parse_tool_parameters, serialize_tool_result
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+THOUGHT_MARKER = "THOUGHT:"
+RESPONSE_MARKER = "RESPONSE:"
+
+RESPONSE_FORMAT_INSTRUCTIONS = (
+    "Before answering, think step by step about how to respond to the user, "
+    "including which tools might be useful and how to structure your response. "
+    "Call the provided tools directly when you need them; independent tool calls "
+    "can be made in parallel.\n"
+    "Format your text output exactly as:\n"
+    f"{THOUGHT_MARKER}\n<your step-by-step reasoning>\n"
+    f"{RESPONSE_MARKER}\n<your reply to the user>"
+)
+
+@functools.lru_cache(maxsize=None)
+def _get_response_prompt() -> "ChatPromptTemplate":
+    """Build the response prompt template on first use.
+    
+    Only the variables are bound per call. The static system message comes first
+    so providers can cache it as a shared prompt prefix.
+    """
+    from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+    
+    return ChatPromptTemplate.from_messages([
+        ("system", "{static_prefix}"),
+        MessagesPlaceholder(variable_name="history"),
+        ("human", "{user_input}"),
+        # Tool calls and tool results produced earlier in the current turn
+        MessagesPlaceholder(variable_name="scratchpad", optional=True)
+    ])
+
+def __getattr__(name: str) -> Any:
+    """Lazily expose RESPONSE_PROMPT without importing LangChain at module load."""
+    if name == "RESPONSE_PROMPT":
+        return _get_response_prompt()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+SUMMARY_MAX_CHARS = 80
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def _summarize_turn(index: int, content: str) -> str:
+    """Collapse a message into a one-line summary for older conversation turns."""
+    content = _WHITESPACE_RE.sub(" ", content).strip()
+    if len(content) > SUMMARY_MAX_CHARS:
+        content = content[:SUMMARY_MAX_CHARS].rstrip() + "…"
+    return f"[turn {index}] {content}"
+
+def _memory_key(content: str) -> str:
+    """Return a stable hash of memory content, ignoring case and whitespace."""
+    normalized = " ".join(content.lower().split())
+    return hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+
 class PydanticAgent:
     """Implementation of an AI agent using Pydantic models for structure and validation."""
     
-    def __init__(self, name: str, description: str, system_prompt: str, openai_api_key: Optional[str] = None):
+    def __init__(self, name: str, description: str, system_prompt: str, openai_api_key: Optional[str] = None,
+                 model: str = "gpt-4o-mini", temperature: float = 0.2,
+                 compress_history: bool = True, recent_keep: int = 8, compress_user_input: bool = False,
+                 max_messages: int = 1024, max_thoughts: int = 512, max_actions: int = 512,
+                 tool_executor: Optional[ToolExecutor] = None, memory_top_k: int = 5,
+                 max_tool_rounds: int = 5):
         """Initialize a new PydanticAgent.
         
         Args:
@@ -26,12 +90,37 @@ class PydanticAgent:
             description: Description of the agent's purpose
             system_prompt: The system prompt that guides the agent's behavior
             openai_api_key: OpenAI API key, defaults to environment variable OPENAI_API_KEY
+            model: OpenAI chat model to use
+            temperature: Sampling temperature for the chat model
+            compress_history: Whether to summarize older turns before sending them to the LLM
+            recent_keep: Number of most recent messages that are always sent verbatim (the latest is always kept)
+            compress_user_input: Whether to strip filler words from user messages sent to the LLM
+            max_messages: Maximum number of conversation messages retained
+            max_thoughts: Maximum number of thoughts retained
+            max_actions: Maximum number of actions retained
+            tool_executor: Strategy used to run tool calls, defaults to SequentialExecutor
+            memory_top_k: Number of most relevant memories included in the prompt
+            max_tool_rounds: Maximum number of tool-calling round trips per user input
         """
         self.api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OpenAI API key must be provided or set as OPENAI_API_KEY environment variable")
+        if recent_keep < 0:
+            raise ValueError("recent_keep must be zero or greater")
+        
+        from langchain_openai import ChatOpenAI
         
-        self.llm = OpenAI(api_key=self.api_key)
+        self.system_prompt = system_prompt
+        self.llm = ChatOpenAI(
+            api_key=self.api_key,
+            model=model,
+            temperature=temperature,
+            streaming=True,
+            # Routes requests sharing the static prefix to the same prompt cache;
+            # sent via extra_body so SDKs without the keyword still accept it
+            extra_body={"prompt_cache_key": f"pydantic-agent:{name}"}
+        )
+        self._response_chain: Optional["Runnable"] = None
         self.agent_model = Agent(
             id=str(uuid.uuid4()),
             name=name,
@@ -40,16 +129,39 @@ class PydanticAgent:
             messages=[Message(role="system", content=system_prompt)],
             memories=[],
             thoughts=[],
-            actions=[]
+            actions=[],
+            max_messages=max_messages,
+            max_thoughts=max_thoughts,
+            max_actions=max_actions
         )
+        self.compress_history = compress_history
+        self.recent_keep = recent_keep
+        self.compress_user_input = compress_user_input
+        self.tool_executor = tool_executor or SequentialExecutor()
+        self.memory_top_k = memory_top_k
+        self.max_tool_rounds = max_tool_rounds
+        self._static_prefix_cache: Optional[str] = None
+        self._memory_index: Dict[str, Memory] = {}
         
     def add_tool(self, tool: Tool) -> None:
         """Add a tool to the agent's available tools."""
         self.agent_model.available_tools.append(tool)
+        self._response_chain = None
         logger.info(f"Added tool: {tool.name}")
         
     def add_memory(self, content: str, source: str, importance: int = 5) -> None:
-        """Add a new memory to the agent."""
+        """Add a new memory to the agent.
+        
+        Memories are deduplicated by content, ignoring case and whitespace; adding
+        a duplicate only refreshes the existing memory's `last_accessed` time.
+        """
+        key = _memory_key(content)
+        existing = self._memory_index.get(key)
+        if existing is not None:
+            existing.last_accessed = datetime.now()
+            logger.info(f"Memory already stored: {existing.id}")
+            return
+        
         memory = Memory(
             id=str(uuid.uuid4()),
             content=content,
@@ -57,71 +169,268 @@ class PydanticAgent:
             importance=importance
         )
         self.agent_model.add_memory(memory)
+        self._memory_index[key] = memory
+        self._static_prefix_cache = None
         logger.info(f"Added memory: {memory.id}")
         
+    def save_state(self, path: str) -> None:
+        """Save the agent's conversation, memories, thoughts and actions to a file.
+        
+        Tools are not saved; they stay registered on the agent that loads the state.
+        """
+        with open(path, "wb") as f:
+            f.write(dump_agent(self.agent_model))
+        logger.info(f"Saved agent state to {path}")
+        
+    def load_state(self, path: str) -> None:
+        """Replace the agent's state with one saved by `save_state`, keeping the current tools."""
+        with open(path, "rb") as f:
+            agent_model = load_agent(f.read())
+        agent_model.available_tools = self.agent_model.available_tools
+        self.agent_model = agent_model
+        self._memory_index = {_memory_key(memory.content): memory for memory in agent_model.memories}
+        self._static_prefix_cache = None
+        logger.info(f"Loaded agent state from {path}")
+        
+    def execute_tools(self, calls: List[ToolCall], timestamp: Optional[datetime] = None) -> List[Any]:
+        """Run a batch of tool calls with the configured executor and record them as actions.
+        
+        Results are returned in the order of `calls`; a failed call yields its exception.
+        The actions are stamped with `timestamp`, defaulting to the current time.
+        """
+        results = self.tool_executor.run(calls)
+        batch_ts = timestamp or datetime.now()
+        for call, result in zip(calls, results):
+            if isinstance(result, Exception):
+                content = f"Error: {result}"
+                logger.warning(f"Tool {call.tool.name} failed: {result}")
+            else:
+                content = serialize_tool_result(result)
+            self.agent_model.record_action(
+                AgentAction.model_construct(
+                    action_type="tool_use",
+                    content=content,
+                    tool_name=call.tool.name,
+                    tool_parameters=call.parameters,
+                    timestamp=batch_ts
+                )
+            )
+        return results
+        
     def _get_prompt_messages(self) -> List[Dict[str, str]]:
         """Convert agent's messages to format expected by LangChain."""
         prompt_messages = []
-        for msg in self.agent_model.messages:
+        for msg in self.agent_model.iter_messages():
             prompt_messages.append({"role": msg.role, "content": msg.content})
         return prompt_messages
         
-    def _format_tools_for_prompt(self) -> str:
-        """Format the available tools as a string for the prompt."""
-        if not self.agent_model.available_tools:
-            return "No tools available."
-            
-        tool_descriptions = []
-        for tool in self.agent_model.available_tools:
-            params_desc = ", ".join([f"{param} (required)" if param in tool.required_parameters 
-                                   else param for param in tool.parameters])
-            tool_descriptions.append(f"Tool: {tool.name}\nDescription: {tool.description}\nParameters: {params_desc}\n")
-            
-        return "\n".join(tool_descriptions)
+    def _build_api_messages(self) -> List[Dict[str, str]]:
+        """Build the message list sent to the LLM, summarizing stale turns.
+        
+        User messages have filler words stripped when `compress_user_input` is set.
+        The system message, the latest message and the last `recent_keep` messages
+        are otherwise kept verbatim; older user/assistant messages are collapsed
+        into one-line summaries.
+        Works on a copy, so the agent's conversation history is never modified.
+        """
+        messages = self._get_prompt_messages()
+        if not messages or messages[0]["role"] != "system":
+            # The system message was evicted from the bounded history
+            messages.insert(0, {"role": "system", "content": self.system_prompt})
+        if self.compress_user_input:
+            for msg in messages:
+                if msg["role"] == "user":
+                    msg["content"] = compress_caveman(msg["content"])
         
-    def _think(self, user_input: str) -> str:
-        """Generate agent thoughts about how to respond to user input."""
-        thinking_prompt = ChatPromptTemplate.from_messages([
-            SystemMessage(content="You are an AI assistant thinking step by step about how to respond to a user. " 
-                                "Think through what tools might be useful and how to structure your response."),
-            HumanMessage(content=f"User input: {user_input}\n\nAvailable tools:\n{self._format_tools_for_prompt()}\n\n"
-                                f"Think step by step about how to respond to this user request.")
-        ])
+        if not self.compress_history or len(messages) <= self.recent_keep + 1:
+            return messages
         
-        thought_chain = thinking_prompt | self.llm | StrOutputParser()
-        thought = thought_chain.invoke({})
+        split = len(messages) - self.recent_keep
+        # The latest message is the one being answered, so it is never summarized
+        for i in range(1, min(split, len(messages) - 1)):
+            msg = messages[i]
+            if msg["role"] in ("user", "assistant"):
+                msg["content"] = _summarize_turn(i, msg["content"])
+        return messages
         
-        self.agent_model.add_thought(thought)
-        return thought
+    def _get_response_chain(self) -> "Runnable":
+        """Return the prompt | llm chain with the available tools bound natively.
+        
+        The chain is cached until the next call to `add_tool`.
+        """
+        if self._response_chain is None:
+            llm = self.llm
+            if self.agent_model.available_tools:
+                llm = llm.bind_tools([tool.to_openai_spec() for tool in self.agent_model.available_tools])
+            self._response_chain = _get_response_prompt() | llm
+        return self._response_chain
+        
+    def _get_static_prefix(self) -> str:
+        """Build the system message that leads every LLM call.
+        
+        It contains the system prompt, the `memory_top_k` most relevant memories and
+        the output format but no per-call data, so it is byte-identical across turns
+        and can be served from the provider's prompt cache. Tools are sent as native
+        tool specifications instead. Cached until a memory is added; memory ranking
+        does not change with time alone.
+        """
+        if self._static_prefix_cache is None:
+            sections = [self.system_prompt]
+            memories = self.agent_model.top_memories(self.memory_top_k)
+            if memories:
+                sections.append("Relevant context:\n" + "\n".join(
+                    f"- {memory.content}" for memory in memories
+                ))
+            sections.append(RESPONSE_FORMAT_INSTRUCTIONS)
+            self._static_prefix_cache = "\n\n".join(sections)
+        return self._static_prefix_cache
+        
+    @staticmethod
+    def _split_thought_and_response(output: str) -> Tuple[str, Optional[str]]:
+        """Split a model output into its thought and response parts.
+        
+        The response is None if the output has no response marker.
+        """
+        thought, marker, response = output.partition(RESPONSE_MARKER)
+        thought = thought.strip()
+        if thought.startswith(THOUGHT_MARKER):
+            thought = thought[len(THOUGHT_MARKER):].strip()
+        return thought, response.strip() if marker else None
+        
+    def _run_tool_calls(self, message: "AIMessage", timestamp: Optional[datetime] = None) -> List["ToolMessage"]:
+        """Execute the tool calls requested in an LLM message and wrap their results."""
+        from langchain_core.messages import ToolMessage
+        
+        tools_by_name = {tool.name: tool for tool in self.agent_model.available_tools}
+        calls = []
+        tool_messages = []
+        for tool_call in message.tool_calls:
+            tool = tools_by_name.get(tool_call["name"])
+            if tool is None:
+                tool_messages.append(ToolMessage(content=f"Error: unknown tool '{tool_call['name']}'",
+                                                 tool_call_id=tool_call["id"]))
+                continue
+            calls.append(ToolCall(id=tool_call["id"], tool=tool, parameters=parse_tool_parameters(tool_call["args"])))
+        for invalid_call in message.invalid_tool_calls:
+            if invalid_call.get("id") is None:
+                # Without an id there is no tool call to answer, so the reply is dropped
+                logger.warning(f"Skipping invalid tool call without id: {invalid_call.get('error')}")
+                continue
+            tool_messages.append(ToolMessage(content=f"Error: {invalid_call.get('error') or 'invalid tool call'}",
+                                             tool_call_id=invalid_call["id"]))
+        
+        for call, result in zip(calls, self.execute_tools(calls, timestamp)):
+            content = f"Error: {result}" if isinstance(result, Exception) else serialize_tool_result(result)
+            tool_messages.append(ToolMessage(content=content, tool_call_id=call.id))
+        return tool_messages
+        
+    def _stream_round(self, inputs: Dict[str, Any], separator: str = "") -> Generator[str, None, "AIMessage"]:
+        """Stream one LLM call, yielding the text that follows the response marker.
+        
+        `separator` is yielded before the first response text. Returns the complete
+        message once the stream ends.
+        """
+        from langchain_core.messages import AIMessage, message_chunk_to_message
+        
+        gathered = None
+        pending = ""
+        in_response = False
+        started = False
+        for chunk in self._get_response_chain().stream(inputs):
+            gathered = chunk if gathered is None else gathered + chunk
+            text = chunk.content if isinstance(chunk.content, str) else ""
+            if not text:
+                continue
+            if not in_response:
+                # Hold output back until the response marker has been seen
+                search_from = max(0, len(pending) - len(RESPONSE_MARKER) + 1)
+                pending += text
+                index = pending.find(RESPONSE_MARKER, search_from)
+                if index == -1:
+                    continue
+                in_response = True
+                text = pending[index + len(RESPONSE_MARKER):]
+            if not started:
+                # Skip whitespace between the marker and the response text
+                text = text.lstrip()
+                if not text:
+                    continue
+                started = True
+                text = separator + text
+            yield text
+        
+        return message_chunk_to_message(gathered) if gathered is not None else AIMessage(content="")
         
     def process_user_input(self, user_input: str) -> str:
-        """Process user input and generate a response."""
+        """Process user input and generate a response.
+        
+        The agent's step-by-step reasoning and its reply are produced by the same
+        LLM call, so the system prompt is only sent once per round trip.
+        """
+        for _ in self.stream_user_input(user_input):
+            pass
+        return self.agent_model.latest_message().content
+        
+    def stream_user_input(self, user_input: str) -> Iterator[str]:
+        """Process user input and yield the response text as it is generated.
+        
+        Tool calls requested by the LLM are dispatched through the tool executor
+        and their results sent back, for up to `max_tool_rounds` round trips. Only
+        the response part of the model output is yielded; thoughts are recorded
+        once the turn is complete.
+        """
+        # One timestamp is shared by every record created during this turn
+        turn_ts = datetime.now()
+        
         # Add user message to conversation history
-        self.agent_model.add_message(role="user", content=user_input)
+        self.agent_model.add_message(role="user", content=user_input, timestamp=turn_ts)
+        
+        api_messages = self._build_api_messages()
         
-        # Generate thoughts about how to respond
-        self._think(user_input)
+        # Messages are ordered static prefix, older history, latest user input,
+        # then this turn's tool calls, to maximize prefix reuse between calls.
+        inputs = {
+            "static_prefix": self._get_static_prefix(),
+            "history": api_messages[1:-1],
+            "user_input": api_messages[-1]["content"],
+            "scratchpad": []
+        }
+        thoughts = []
+        responses = []
+        for round_index in range(self.max_tool_rounds + 1):
+            separator = "\n\n" if any(responses) else ""
+            message = yield from self._stream_round(inputs, separator)
+            thought, response = self._split_thought_and_response(
+                message.content if isinstance(message.content, str) else ""
+            )
+            thoughts.append(thought)
+            if response is not None:
+                responses.append(response)
+            
+            if round_index == self.max_tool_rounds or not (message.tool_calls or message.invalid_tool_calls):
+                break
+            inputs["scratchpad"] = [*inputs["scratchpad"], message, *self._run_tool_calls(message, turn_ts)]
         
-        # Create main prompt
-        main_prompt = ChatPromptTemplate.from_messages([
-            SystemMessage(content=self.agent_model.messages[0].content),  # System prompt
-            HumanMessage(content=f"Available tools:\n{self._format_tools_for_prompt()}\n\n"
-                                f"User input: {user_input}")
-        ])
+        if responses:
+            response = "\n\n".join(r for r in responses if r)
+        else:
+            # The model ignored the output format; its final text is the response
+            response = thoughts.pop()
+            if response:
+                yield response
         
-        # Generate response
-        response_chain = main_prompt | self.llm | StrOutputParser()
-        response = response_chain.invoke({})
+        thought = "\n\n".join(t for t in thoughts if t)
+        if thought:
+            self.agent_model.add_thought(thought, timestamp=turn_ts)
         
         # Record response as an action
         self.agent_model.record_action(
-            AgentAction(
+            AgentAction.model_construct(
                 action_type="response",
-                content=response
+                content=response,
+                timestamp=turn_ts
             )
         )
         
         # Add assistant message to conversation history
-        self.agent_model.add_message(role="assistant", content=response)
-        
-        return response
+        self.agent_model.add_message(role="assistant", content=response, timestamp=turn_ts)
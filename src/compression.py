@@ -0,0 +1,84 @@
+"""
+Deterministic prompt compression helpers.
+These strip filler words from text before it is sent to the LLM, saving input
+tokens without an extra model call.
+"""
+
+import re
+
+# Politeness, hedging and filler phrases that carry no meaning for the LLM.
+# Modal questions ("can you ...") are only stripped in their polite form, since
+# on their own they may be genuine questions about the assistant. Idioms where a
+# filler word carries meaning ("simply put", "thanks to") are left alone.
+_FILLERS = re.compile(
+    r"\b(?:"
+    r"(?:could|would|can|will) you (?:please|kindly)"
+    r"|i(?: would|'d) like(?: you)? to"
+    r"|i was wondering if"
+    r"|it seems(?: that| like)?"
+    r"|please|kindly|basically|actually|just|really|simply(?! put\b)"
+    r"|thank you(?: so much| very much)?|thanks(?! to\b)"
+    r")\b[ \t]*",
+    re.IGNORECASE,
+)
+# Code and quoted spans are passed through untouched
+_PROTECTED = re.compile(
+    r"```[\s\S]*?```"
+    r"|`[^`\n]+`"
+    r"|\"[^\"\n]*\""
+    r"|\u201c[^\u201d\n]*\u201d"
+    r"|(?<!\w)'[^'\n]*'(?!\w)"
+)
+_PLACEHOLDER = re.compile(r"\x00(\d+)\x00")
+_SPACE_BEFORE_PUNCT = re.compile(r"[ \t]+([,.!?;:])")
+_REPEATED_PUNCT = re.compile(r"([,;:])(?:[ \t]*[,;:])+")
+_DANGLING_PUNCT = re.compile(r"[,;:]+(?=[.!?])|(?<=[.!?])[,;:]+")
+_LEADING_PUNCT = re.compile(r"^[,;:]+[ \t]*")
+# Runs of blanks inside a line; leading indentation is preserved
+_INNER_WHITESPACE = re.compile(r"(?<=\S)[ \t]{2,}")
+_WORD = re.compile(r"\w")
+
+def compress_caveman(text: str) -> str:
+    """
+    Remove filler phrases and redundant whitespace from text.
+    
+    The rules are purely rule-based, so the same input always produces the
+    same output. Code, quoted text and indentation are kept as written.
+    Returns the original text if nothing meaningful remains.
+    
+    >>> compress_caveman("Could you please tell me the weather in New York?")
+    'tell me the weather in New York?'
+    >>> compress_caveman("Can you swim?")
+    'Can you swim?'
+    >>> compress_caveman("Will you remember my name?")
+    'Will you remember my name?'
+    >>> compress_caveman("Could you kindly check whether you can read files?")
+    'check whether you can read files?'
+    >>> compress_caveman("  indented code:\\n    x = 1")
+    '  indented code:\\n    x = 1'
+    >>> compress_caveman("Translate 'please help me' to French")
+    "Translate 'please help me' to French"
+    >>> compress_caveman("Write a sentence using the word 'basically'.")
+    "Write a sentence using the word 'basically'."
+    >>> compress_caveman("Please fix `just_do_it()`, thanks!")
+    'fix `just_do_it()`!'
+    >>> compress_caveman("Simply put, what is AI?")
+    'Simply put, what is AI?'
+    >>> compress_caveman("Thanks to the rain, is the river high?")
+    'Thanks to the rain, is the river high?'
+    """
+    protected = []
+    
+    def protect(match: re.Match) -> str:
+        protected.append(match.group())
+        return f"\x00{len(protected) - 1}\x00"
+    
+    compressed = _PROTECTED.sub(protect, text)
+    compressed = _FILLERS.sub("", compressed)
+    compressed = _INNER_WHITESPACE.sub(" ", compressed)
+    compressed = _SPACE_BEFORE_PUNCT.sub(r"\1", compressed)
+    compressed = _REPEATED_PUNCT.sub(r"\1", compressed)
+    compressed = _DANGLING_PUNCT.sub("", compressed)
+    compressed = _LEADING_PUNCT.sub("", compressed).rstrip()
+    compressed = _PLACEHOLDER.sub(lambda match: protected[int(match.group(1))], compressed)
+    return compressed if _WORD.search(compressed) else text
@@ -0,0 +1,77 @@
+"""
+Executors that run the tool calls requested by the agent.
+The sequential executor runs calls one after another; the concurrent executor
+overlaps them so a batch of I/O-bound calls takes as long as the slowest one.
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, List, Optional
+
+from .models import ToolCall
+from .tools_runtime import close_session
+
+class ToolExecutor(ABC):
+    """Base class for strategies that run a batch of tool calls."""
+    
+    @abstractmethod
+    def run(self, calls: List[ToolCall]) -> List[Any]:
+        """
+        Run the tool calls and return their results in the same order.
+        
+        A call that raises yields its exception in place of a result, so one
+        failing tool does not discard the results of the others.
+        """
+    
+    def close(self) -> None:
+        """Release any resources held by the executor."""
+
+class SequentialExecutor(ToolExecutor):
+    """Runs tool calls one at a time in the calling thread."""
+    
+    def run(self, calls: List[ToolCall]) -> List[Any]:
+        results = []
+        for call in calls:
+            try:
+                results.append(call.tool.invoke(call.parameters))
+            except Exception as e:
+                results.append(e)
+        return results
+
+class ConcurrentExecutor(ToolExecutor):
+    """
+    Runs tool calls concurrently on a dedicated event loop.
+    
+    Tools with an async implementation are awaited directly; synchronous tools
+    run in worker threads. The loop is reused across batches so HTTP sessions
+    held by async tools stay alive between turns. `run` must not be called
+    from a thread that is already running an event loop.
+    """
+    
+    def __init__(self, max_concurrency: int = 5):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def run(self, calls: List[ToolCall]) -> List[Any]:
+        if not calls:
+            return []
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(self._run(calls))
+    
+    async def _run(self, calls: List[ToolCall]) -> List[Any]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def run_one(call: ToolCall) -> Any:
+            async with semaphore:
+                return await call.tool.ainvoke(call.parameters)
+        
+        return await asyncio.gather(*(run_one(call) for call in calls), return_exceptions=True)
+    
+    def close(self) -> None:
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.run_until_complete(close_session())
+            self._loop.close()
+        self._loop = None
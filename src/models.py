@@ -1,13 +1,54 @@
-from typing import List, Optional, Dict, Any, Union
-from pydantic import BaseModel, Field, model_validator
+import asyncio
+import heapq
+import math
+import sys
+import time
+from collections import deque
+from typing import List, Optional, Dict, Any, Union, Deque, Callable, Awaitable, Iterable, Iterator, Tuple
+import msgspec
+from pydantic import BaseModel, Field, PrivateAttr, computed_field, model_validator
 from datetime import datetime
 
+# Time constant for the exponential decay of memory relevance
+MEMORY_DECAY_SECONDS = 86400
+
+def _local_naive(value: datetime) -> datetime:
+    """Convert an aware datetime to naive local time; naive values are returned as is."""
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo else value
+
 class Message(BaseModel):
     """Represents a message in a conversation with an AI agent."""
     role: str = Field(..., description="The role of the message sender (e.g., 'system', 'user', 'assistant')")
     content: str = Field(..., description="The content of the message")
     timestamp: datetime = Field(default_factory=datetime.now, description="When the message was created")
 
+# Interned role strings shared by every stored message
+_ROLE_SYSTEM = sys.intern("system")
+_ROLE_USER = sys.intern("user")
+_ROLE_ASSISTANT = sys.intern("assistant")
+_ROLE_MAP = {role: role for role in (_ROLE_SYSTEM, _ROLE_USER, _ROLE_ASSISTANT)}
+
+def _intern_role(role: str) -> str:
+    """Return the shared string object for a message role."""
+    return _ROLE_MAP.get(role) or sys.intern(role)
+
+class MessageStruct(msgspec.Struct, frozen=True, array_like=True, gc=False):
+    """Compact internal storage for a conversation message.
+    
+    A msgspec struct, so stored history can be serialized by msgspec's C encoder.
+    """
+    role: str
+    content: str
+    timestamp: float
+    
+    @classmethod
+    def from_message(cls, message: Message) -> 'MessageStruct':
+        return cls(_intern_role(message.role), message.content, message.timestamp.timestamp())
+    
+    def to_message(self) -> Message:
+        return Message.model_construct(role=self.role, content=self.content,
+                                       timestamp=datetime.fromtimestamp(self.timestamp))
+
 class Memory(BaseModel):
     """Represents an agent's memory of past interactions or knowledge."""
     id: str = Field(..., description="Unique identifier for the memory")
@@ -29,10 +70,58 @@ class Tool(BaseModel):
     description: str = Field(..., description="Description of what the tool does")
     parameters: Dict[str, Any] = Field(default_factory=dict, description="Parameters the tool accepts")
     required_parameters: List[str] = Field(default_factory=list, description="List of required parameter names")
+    fn: Optional[Callable[..., Any]] = Field(None, exclude=True, description="Function implementing the tool")
+    async_fn: Optional[Callable[..., Awaitable[Any]]] = Field(None, exclude=True, description="Async variant of the tool function")
+    
+    def to_openai_spec(self) -> Dict[str, Any]:
+        """Convert the tool to an OpenAI function-calling tool specification.
+        
+        Parameter values may be a plain description (treated as a string argument)
+        or a JSON schema dict.
+        """
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        name: spec if isinstance(spec, dict) else {"type": "string", "description": str(spec)}
+                        for name, spec in self.parameters.items()
+                    },
+                    "required": list(self.required_parameters)
+                }
+            }
+        }
     
     def validate_parameters(self, params: Dict[str, Any]) -> bool:
         """Validates that all required parameters are present."""
         return all(param in params for param in self.required_parameters)
+    
+    def invoke(self, params: Dict[str, Any]) -> Any:
+        """Run the tool's function with the given parameters."""
+        if not self.validate_parameters(params):
+            raise ValueError(f"Missing required parameters for tool '{self.name}'")
+        if self.fn is not None:
+            return self.fn(**params)
+        if self.async_fn is not None:
+            return asyncio.run(self.async_fn(**params))
+        raise ValueError(f"Tool '{self.name}' has no implementation")
+    
+    async def ainvoke(self, params: Dict[str, Any]) -> Any:
+        """Run the tool asynchronously, using a worker thread if it has no async variant."""
+        if self.async_fn is None:
+            return await asyncio.to_thread(self.invoke, params)
+        if not self.validate_parameters(params):
+            raise ValueError(f"Missing required parameters for tool '{self.name}'")
+        return await self.async_fn(**params)
+
+class ToolCall(BaseModel):
+    """Represents a request to run a tool with specific parameters."""
+    id: Optional[str] = Field(None, description="Identifier assigned to the call by the LLM")
+    tool: Tool = Field(..., description="The tool to run")
+    parameters: Dict[str, Any] = Field(default_factory=dict, description="Parameters to pass to the tool")
 
 class AgentAction(BaseModel):
     """Represents an action taken by the agent."""
@@ -53,23 +142,107 @@ class Agent(BaseModel):
     name: str = Field(..., description="The agent's name")
     description: str = Field(..., description="Description of the agent's purpose")
     available_tools: List[Tool] = Field(default_factory=list, description="Tools available to this agent")
-    messages: List[Message] = Field(default_factory=list, description="Conversation history")
     memories: List[Memory] = Field(default_factory=list, description="Agent's memories")
-    thoughts: List[AgentThought] = Field(default_factory=list, description="Agent's thought process")
-    actions: List[AgentAction] = Field(default_factory=list, description="Actions taken by the agent")
+    thoughts: Deque[AgentThought] = Field(default_factory=deque, description="Agent's thought process")
+    actions: Deque[AgentAction] = Field(default_factory=deque, description="Actions taken by the agent")
+    max_messages: int = Field(default=1024, ge=1, description="Maximum number of messages retained")
+    max_thoughts: int = Field(default=512, ge=1, description="Maximum number of thoughts retained")
+    max_actions: int = Field(default=512, ge=1, description="Maximum number of actions retained")
+    
+    # Conversation history, stored as slotted records and exposed through `messages`
+    _messages: Deque[MessageStruct] = PrivateAttr(default_factory=deque)
     
-    def add_message(self, role: str, content: str) -> None:
-        """Add a message to the conversation history."""
-        self.messages.append(Message(role=role, content=content))
+    @model_validator(mode='wrap')
+    @classmethod
+    def load_messages(cls, data: Any, handler: Callable[[Any], 'Agent']) -> 'Agent':
+        """Move incoming messages into the internal message store."""
+        messages = ()
+        if isinstance(data, dict) and "messages" in data:
+            data = dict(data)
+            messages = data.pop("messages") or ()
+        agent = handler(data)
+        agent._messages.extend(MessageStruct.from_message(Message.model_validate(m)) for m in messages)
+        return agent
     
-    def add_thought(self, content: str) -> None:
-        """Add a thought to the agent's thought process."""
-        self.thoughts.append(AgentThought(content=content))
+    @model_validator(mode='after')
+    def bound_history(self) -> 'Agent':
+        """Cap the history collections so the oldest entries are evicted first."""
+        self._messages = deque(self._messages, maxlen=self.max_messages)
+        self.thoughts = deque(self.thoughts, maxlen=self.max_thoughts)
+        self.actions = deque(self.actions, maxlen=self.max_actions)
+        return self
+    
+    @computed_field(description="Conversation history")
+    @property
+    def messages(self) -> Tuple[Message, ...]:
+        """Conversation history as Pydantic models, built on each access.
+        
+        The snapshot is read-only; use `add_message` or `extend_messages` to
+        change the history.
+        """
+        return tuple(message.to_message() for message in self._messages)
+    
+    def iter_messages(self) -> Iterator[MessageStruct]:
+        """Iterate over the stored message records without building models.
+        
+        Records have the same `role` and `content` attributes as `Message`, with
+        `timestamp` as a POSIX timestamp.
+        """
+        return iter(self._messages)
+    
+    def extend_messages(self, records: Iterable[MessageStruct]) -> None:
+        """Append stored message records, e.g. when restoring a snapshot."""
+        self._messages.extend(
+            MessageStruct(_intern_role(record.role), record.content, record.timestamp) for record in records
+        )
+    
+    def latest_message(self) -> Optional[Message]:
+        """Return the most recent message, if any."""
+        return self._messages[-1].to_message() if self._messages else None
+    
+    def add_message(self, role: str, content: str, timestamp: Optional[datetime] = None) -> None:
+        """Add a message to the conversation history.
+        
+        Messages are generated by the agent itself, so validation is skipped.
+        The timestamp defaults to the current time.
+        """
+        self._messages.append(MessageStruct(
+            _intern_role(role),
+            content,
+            timestamp.timestamp() if timestamp else time.time()
+        ))
+    
+    def add_thought(self, content: str, timestamp: Optional[datetime] = None) -> None:
+        """Add a thought to the agent's thought process.
+        
+        Thoughts are generated by the agent itself, so validation is skipped.
+        The timestamp defaults to the current time.
+        """
+        self.thoughts.append(AgentThought.model_construct(content=content, timestamp=timestamp or datetime.now()))
         
     def add_memory(self, memory: Memory) -> None:
         """Add a memory to the agent's memory store."""
         self.memories.append(memory)
     
+    def top_memories(self, k: int = 5, now: Optional[datetime] = None) -> List[Memory]:
+        """Return the k most relevant memories, scored by importance decayed with age.
+        
+        Each memory scores `importance * exp(-age / 1 day)`. Selected memories have
+        their `last_accessed` time updated. Aware and naive datetimes may be mixed;
+        aware values are compared in local time.
+        """
+        now = _local_naive(now) if now else datetime.now()
+        selected = heapq.nlargest(
+            k,
+            self.memories,
+            key=lambda m: m.importance * math.exp(
+                -(now - _local_naive(m.created_at)).total_seconds() / MEMORY_DECAY_SECONDS
+            )
+        )
+        for memory in selected:
+            memory.last_accessed = now
+        return selected
+    
     def record_action(self, action: AgentAction) -> None:
         """Record an action taken by the agent."""
         self.actions.append(action)
@@ -0,0 +1,116 @@
+"""
+Snapshotting of agent state.
+State is serialized with msgspec structs mirroring the Pydantic models, so
+encoding and decoding run in msgspec's C implementation instead of going
+through Pydantic's model_dump and validation.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import msgspec
+
+from .models import Agent, AgentAction, AgentThought, Memory, MessageStruct
+
+SNAPSHOT_VERSION = 1
+
+class MemoryStruct(msgspec.Struct, array_like=True):
+    """Snapshot form of a Memory."""
+    id: str
+    content: str
+    source: str
+    importance: int
+    created_at: datetime
+    last_accessed: Optional[datetime] = None
+
+class ThoughtStruct(msgspec.Struct, array_like=True):
+    """Snapshot form of an AgentThought."""
+    content: str
+    timestamp: datetime
+
+class ActionStruct(msgspec.Struct, array_like=True):
+    """Snapshot form of an AgentAction."""
+    action_type: str
+    content: Optional[str]
+    tool_name: Optional[str]
+    tool_parameters: Optional[Dict[str, Any]]
+    timestamp: datetime
+
+class AgentStruct(msgspec.Struct):
+    """
+    Snapshot of an Agent's state.
+    
+    Tools are not included because their implementations cannot be serialized;
+    they are registered again by the code that restores the agent.
+    """
+    version: int
+    id: str
+    name: str
+    description: str
+    max_messages: int
+    max_thoughts: int
+    max_actions: int
+    messages: List[MessageStruct]
+    memories: List[MemoryStruct]
+    thoughts: List[ThoughtStruct]
+    actions: List[ActionStruct]
+
+_encoder = msgspec.msgpack.Encoder()
+_decoder = msgspec.msgpack.Decoder(AgentStruct)
+
+def dump_agent(agent: Agent) -> bytes:
+    """Serialize an agent's state, excluding its tools, to msgpack bytes."""
+    return _encoder.encode(AgentStruct(
+        version=SNAPSHOT_VERSION,
+        id=agent.id,
+        name=agent.name,
+        description=agent.description,
+        max_messages=agent.max_messages,
+        max_thoughts=agent.max_thoughts,
+        max_actions=agent.max_actions,
+        messages=list(agent.iter_messages()),
+        memories=[
+            MemoryStruct(m.id, m.content, m.source, m.importance, m.created_at, m.last_accessed)
+            for m in agent.memories
+        ],
+        thoughts=[ThoughtStruct(t.content, t.timestamp) for t in agent.thoughts],
+        actions=[
+            ActionStruct(a.action_type, a.content, a.tool_name, a.tool_parameters, a.timestamp)
+            for a in agent.actions
+        ]
+    ))
+
+def load_agent(data: bytes) -> Agent:
+    """
+    Restore an agent from bytes produced by `dump_agent`.
+    
+    The snapshot was written from validated models, so they are rebuilt without
+    validation. The restored agent has no tools.
+    """
+    state = _decoder.decode(data)
+    if state.version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported agent snapshot version: {state.version}")
+    
+    agent = Agent.model_construct(
+        id=state.id,
+        name=state.name,
+        description=state.description,
+        available_tools=[],
+        memories=[
+            Memory.model_construct(id=m.id, content=m.content, source=m.source, importance=m.importance,
+                                   created_at=m.created_at, last_accessed=m.last_accessed)
+            for m in state.memories
+        ],
+        thoughts=[AgentThought.model_construct(content=t.content, timestamp=t.timestamp) for t in state.thoughts],
+        actions=[
+            AgentAction.model_construct(action_type=a.action_type, content=a.content, tool_name=a.tool_name,
+                                        tool_parameters=a.tool_parameters, timestamp=a.timestamp)
+            for a in state.actions
+        ],
+        max_messages=state.max_messages,
+        max_thoughts=state.max_thoughts,
+        max_actions=state.max_actions
+    )
+    agent.bound_history()
+    agent.extend_messages(state.messages)
+    return agent
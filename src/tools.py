@@ -3,13 +3,18 @@ Tools that can be used by the PydanticAgent.
 Each tool is defined as a function and wrapped with a Tool model.
 """
 
-import json
-import requests
+import ast
+import functools
+import orjson
+import types
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Union
 import os
 
+from pydantic import BaseModel
+
 from .models import Tool
+from .tools_runtime import get_weather_async, get_weather_sync
 
 def create_weather_tool() -> Tool:
     """Create a weather tool that can fetch weather information for a location."""
@@ -19,7 +24,9 @@ def create_weather_tool() -> Tool:
         parameters={
             "location": "The city and state or country (e.g., 'New York, NY' or 'London, UK')"
         },
-        required_parameters=["location"]
+        required_parameters=["location"],
+        fn=get_weather,
+        async_fn=get_weather_async
     )
 
 def create_search_tool() -> Tool:
@@ -29,9 +36,10 @@ def create_search_tool() -> Tool:
         description="Search the web for information",
         parameters={
             "query": "The search query",
-            "num_results": "Number of results to return (default: 5)"
+            "num_results": {"type": "integer", "description": "Number of results to return (default: 5)"}
         },
-        required_parameters=["query"]
+        required_parameters=["query"],
+        fn=web_search
     )
 
 def create_calculator_tool() -> Tool:
@@ -42,7 +50,8 @@ def create_calculator_tool() -> Tool:
         parameters={
             "expression": "The mathematical expression to evaluate (e.g., '2 + 2')"
         },
-        required_parameters=["expression"]
+        required_parameters=["expression"],
+        fn=calculator
     )
 
 def create_time_tool() -> Tool:
@@ -53,7 +62,84 @@ def create_time_tool() -> Tool:
         parameters={
             "timezone": "Optional timezone (default: UTC)"
         },
-        required_parameters=[]
+        required_parameters=[],
+        fn=get_time
+    )
+
+def _json_default(obj: Any) -> Any:
+    """Serialize values orjson does not handle natively."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    return str(obj)
+
+def serialize_tool_result(result: Any) -> str:
+    """Serialize a tool result to a JSON string."""
+    return orjson.dumps(result, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+def parse_tool_parameters(raw: Union[str, bytes, Dict[str, Any]]) -> Dict[str, Any]:
+    """Parse tool parameters emitted by the LLM as a JSON object."""
+    if isinstance(raw, dict):
+        return raw
+    params = orjson.loads(raw) if raw else {}
+    if not isinstance(params, dict):
+        raise ValueError("Tool parameters must be a JSON object")
+    return params
+
+# AST node types permitted in calculator expressions
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Pow, ast.Mod,
+    ast.USub, ast.UAdd
+)
+
+# Largest exponent accepted by the calculator; bigger powers can take minutes to evaluate
+_MAX_EXPONENT = 100
+
+def _check_power(node: ast.BinOp) -> None:
+    """Reject powers that are nested or whose exponent is not a small constant."""
+    exponent = node.right
+    if isinstance(exponent, ast.UnaryOp) and isinstance(exponent.op, (ast.USub, ast.UAdd)):
+        exponent = exponent.operand
+    if not (
+        isinstance(exponent, ast.Constant)
+        and isinstance(exponent.value, (int, float))
+        and abs(exponent.value) <= _MAX_EXPONENT
+    ):
+        raise ValueError(f"Exponent must be a constant between -{_MAX_EXPONENT} and {_MAX_EXPONENT}")
+    if any(isinstance(child, ast.BinOp) and isinstance(child.op, ast.Pow) for child in ast.walk(node.left)):
+        raise ValueError("Nested powers are not supported")
+
+@functools.lru_cache(maxsize=256)
+def _compile_expression(expression: str) -> types.CodeType:
+    """Parse and compile an arithmetic expression, rejecting anything else."""
+    tree = ast.parse(expression.strip(), mode="eval")
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported expression element: {type(node).__name__}")
+        if isinstance(node, ast.Constant) and (
+            isinstance(node.value, bool) or not isinstance(node.value, (int, float))
+        ):
+            raise ValueError(f"Unsupported constant: {node.value!r}")
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow):
+            _check_power(node)
+    return compile(tree, "<calculator>", "eval")
+
+# Formatters for mock search results
+_TITLE_FMT = "Result {i} for '{q}'".format
+_URL_FMT = "https://example.com/result{i}".format
+_SNIPPET_FMT = "This is a snippet of information related to {q}...".format
+
+@functools.lru_cache(maxsize=256)
+def _mock_search_results(query: str, num_results: int) -> Tuple[Dict[str, str], ...]:
+    """Build the mock search results for a query."""
+    snippet = _SNIPPET_FMT(q=query)
+    return tuple(
+        {
+            "title": _TITLE_FMT(i=i, q=query),
+            "url": _URL_FMT(i=i),
+            "snippet": snippet
+        }
+        for i in range(1, num_results + 1)
     )
 
 # Example implementations of tool functions
@@ -61,20 +147,10 @@ def get_weather(location: str) -> Dict[str, Any]:
     """
     Get current weather for a location.
     
-    In a real implementation, this would call a weather API.
-    This is a mock implementation for demonstration purposes.
+    Blocking entry point for the same wttr.in lookup and cache used by
+    `get_weather_async`, so every executor reports the same data.
     """
-    # Mock implementation
-    weather_data = {
-        "location": location,
-        "temperature": 72,
-        "condition": "Partly Cloudy",
-        "humidity": 45,
-        "wind_speed": 8,
-        "timestamp": datetime.now().isoformat()
-    }
-    
-    return weather_data
+    return get_weather_sync(location)
 
 def web_search(query: str, num_results: int = 5) -> List[Dict[str, str]]:
     """
@@ -83,29 +159,18 @@ def web_search(query: str, num_results: int = 5) -> List[Dict[str, str]]:
     In a real implementation, this would call a search API.
     This is a mock implementation for demonstration purposes.
     """
-    # Mock implementation
-    results = [
-        {
-            "title": f"Result {i+1} for '{query}'",
-            "url": f"https://example.com/result{i+1}",
-            "snippet": f"This is a snippet of information related to {query}..."
-        }
-        for i in range(min(num_results, 10))
-    ]
-    
-    return results
+    # Mock implementation; results are deterministic, so they are cached
+    return [dict(result) for result in _mock_search_results(query, min(num_results, 10))]
 
 def calculator(expression: str) -> Dict[str, Any]:
     """
     Evaluate a mathematical expression.
     
-    Uses Python's eval function. In production, you would want to use
-    a safer evaluation method.
+    Only numeric literals and arithmetic operators are allowed; anything else
+    is rejected before evaluation. Compiled expressions are cached.
     """
     try:
-        # In a real implementation, you'd use a safer evaluation method
-        # This is for demonstration only
-        result = eval(expression, {"__builtins__": {}})
+        result = eval(_compile_expression(expression), {"__builtins__": {}}, {})
         return {
             "expression": expression,
             "result": result
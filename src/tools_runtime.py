@@ -0,0 +1,132 @@
+"""
+Async runtime implementations of agent tools.
+These call real network services through a shared, keep-alive HTTP session
+and cache responses so repeated tool calls avoid the round trip.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Any, Tuple
+from urllib.parse import quote
+
+import orjson
+from cachetools import TTLCache
+
+# aiohttp is imported when the first request is made to keep startup fast
+if TYPE_CHECKING:
+    import aiohttp
+
+WEATHER_API_URL = "https://wttr.in/{location}?format=j1"
+HTTP_TIMEOUT_SECONDS = 10
+
+# Shared HTTP sessions, one per event loop since sessions are bound to the loop
+# that created them. Each is paired with the task that closes it.
+_sessions: Dict[asyncio.AbstractEventLoop, Tuple["aiohttp.ClientSession", asyncio.Task]] = {}
+
+# Weather responses keyed by normalized location, kept for five minutes
+_weather_cache: TTLCache = TTLCache(maxsize=1024, ttl=300)
+
+async def _hold_session(session: "aiohttp.ClientSession") -> None:
+    """
+    Keep a session open until cancelled, then close it.
+    
+    `asyncio.run` cancels leftover tasks before closing its loop, so sessions
+    created under it are closed while their loop can still tear down the
+    connections.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.create_future()
+    finally:
+        if _sessions.get(loop, (None,))[0] is session:
+            del _sessions[loop]
+        await session.close()
+
+async def _get_session() -> "aiohttp.ClientSession":
+    """Return the shared HTTP session for the running loop, creating it if needed."""
+    import aiohttp
+    
+    loop = asyncio.get_running_loop()
+    entry = _sessions.get(loop)
+    if entry is None or entry[0].closed:
+        session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SECONDS)
+        )
+        entry = _sessions[loop] = (session, loop.create_task(_hold_session(session)))
+    return entry[0]
+
+async def close_session() -> None:
+    """Close the running loop's shared HTTP session."""
+    entry = _sessions.get(asyncio.get_running_loop())
+    if entry is not None:
+        holder = entry[1]
+        holder.cancel()
+        await asyncio.gather(holder, return_exceptions=True)
+
+def _normalize_location(location: str) -> str:
+    """Normalize a location string for use as a cache key."""
+    return " ".join(location.lower().split())
+
+def _weather_result(location: str, weather_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a weather result, echoing the caller's own spelling of the location."""
+    return {"location": location, **weather_data}
+
+async def _fetch_weather(session: "aiohttp.ClientSession", location: str) -> Dict[str, Any]:
+    """Query the weather API with the given session and cache the result."""
+    key = _normalize_location(location)
+    async with session.get(WEATHER_API_URL.format(location=quote(key))) as response:
+        response.raise_for_status()
+        data = await response.json(content_type=None, loads=orjson.loads)
+
+    current = data["current_condition"][0]
+    # Cached without the location, since one entry serves every spelling of it
+    weather_data = {
+        "temperature": int(current["temp_F"]),
+        "condition": current["weatherDesc"][0]["value"],
+        "humidity": int(current["humidity"]),
+        "wind_speed": int(current["windspeedMiles"]),
+        "timestamp": datetime.now().isoformat()
+    }
+    _weather_cache[key] = weather_data
+    return _weather_result(location, weather_data)
+
+async def get_weather_async(location: str) -> Dict[str, Any]:
+    """
+    Get current weather for a location.
+
+    Queries the wttr.in JSON API through the shared HTTP session. Results are
+    cached per normalized location for five minutes.
+    """
+    cached = _weather_cache.get(_normalize_location(location))
+    if cached is not None:
+        return _weather_result(location, cached)
+    return await _fetch_weather(await _get_session(), location)
+
+def get_weather_sync(location: str) -> Dict[str, Any]:
+    """
+    Blocking variant of `get_weather_async` for callers without an event loop.
+
+    Shares the same cache; a cache miss uses a short-lived session so the shared
+    sessions stay bound to their own event loops. When called from a thread that
+    is already running an event loop, the fetch runs on a worker thread.
+    """
+    cached = _weather_cache.get(_normalize_location(location))
+    if cached is not None:
+        return _weather_result(location, cached)
+
+    async def fetch() -> Dict[str, Any]:
+        import aiohttp
+
+        async with aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SECONDS)
+        ) as session:
+            return await _fetch_weather(session, location)
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(fetch())
+    # asyncio.run cannot be nested inside a running loop
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, fetch()).result()
@@ -0,0 +1,42 @@
+"""Tests for how PydanticAgent builds the messages sent to the LLM."""
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from src.agent import PydanticAgent
+
+def make_agent(**kwargs) -> PydanticAgent:
+    return PydanticAgent(
+        name="Test",
+        description="Test agent",
+        system_prompt="You are a test agent.",
+        openai_api_key="test-key",
+        **kwargs
+    )
+
+def test_recent_keep_zero_keeps_latest_message():
+    agent = make_agent(recent_keep=0)
+    agent.agent_model.add_message("user", "What is the capital of France?")
+    agent.agent_model.add_message("assistant", "Paris.")
+    agent.agent_model.add_message("user", "And of Italy?")
+
+    messages = agent._build_api_messages()
+
+    assert messages[0] == {"role": "system", "content": "You are a test agent."}
+    assert messages[-1] == {"role": "user", "content": "And of Italy?"}
+    assert all(msg["content"].startswith("[turn ") for msg in messages[1:-1])
+
+def test_negative_recent_keep_is_rejected():
+    with pytest.raises(ValueError):
+        make_agent(recent_keep=-1)
+
+def test_invalid_tool_call_without_id_is_skipped():
+    agent = make_agent()
+    message = AIMessage(content="", invalid_tool_calls=[
+        {"type": "invalid_tool_call", "id": None, "name": "calculator", "args": "{", "error": "bad json"},
+        {"type": "invalid_tool_call", "id": "call_1", "name": "calculator", "args": "{", "error": None},
+    ])
+
+    tool_messages = agent._run_tool_calls(message)
+
+    assert [(msg.tool_call_id, msg.content) for msg in tool_messages] == [("call_1", "Error: invalid tool call")]
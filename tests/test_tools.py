@@ -0,0 +1,31 @@
+"""Tests for the calculator tool's expression evaluator."""
+
+import pytest
+
+from src.tools import calculator
+
+@pytest.mark.parametrize("expression, expected", [
+    ("2 + 2", 4),
+    ("2**10", 1024),
+    ("2**-1", 0.5),
+    ("-2**2", -4),
+    ("7 // 2 + 7 % 2", 4),
+])
+def test_evaluates_arithmetic(expression, expected):
+    assert calculator(expression) == {"expression": expression, "result": expected}
+
+@pytest.mark.parametrize("expression", [
+    "9**9**9",     # nested power
+    "(2**3)**2",   # power inside the base
+    "2**1000",     # exponent too large
+    "2**(1+1)",    # exponent is not a constant
+    "abs(1)",      # function call
+    "True+1",      # bool constant
+    "'a'*3",       # string constant
+    "__import__('os')",
+])
+def test_rejects_unsafe_expressions(expression):
+    result = calculator(expression)
+    assert result["expression"] == expression
+    assert "result" not in result
+    assert result["error"]